@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+"""
+Ahead-of-time build of the numerical kernels with numba.pycc, so
+production runs skip the JIT compilation that otherwise hits the
+first call. Build the shared library once per install with
+    python -m qsofitmore._kernels_aot
+which drops a `qsofit_kernels` extension module inside the package;
+fitmodule picks it up automatically and falls back to the JIT (or
+plain NumPy) version when it is absent.
+"""
+import os
+from numba.pycc import CC
+from ._kernels import narrow_line_prop_core
+
+cc = CC('qsofit_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('narrow_line_prop',
+          'UniTuple(f8, 5)(f8, f8, f8, f8, f8[:], f8[:])')(
+    narrow_line_prop_core)
+
+
+if __name__ == '__main__':
+    cc.compile()
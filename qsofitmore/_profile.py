@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+# timing is off unless explicitly requested, so the hooks cost nothing
+# in production runs
+PROFILE_ENABLED = os.environ.get('QSOFITMORE_PROFILE', '0') == '1'
+
+
+@contextmanager
+def phase_timer(name, store):
+    """
+    Record the wall-clock time of one fitting phase.
+    Appends (name, dt_ns) to store when profiling is enabled through
+    the QSOFITMORE_PROFILE=1 environment variable; otherwise a no-op.
+    Parameters:
+    ----------
+        name : str
+            label of the phase, e.g. '_DoLineFit'.
+        store : list
+            the per-object record list the timing is appended to.
+    """
+    if not PROFILE_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        store.append((name, time.perf_counter_ns() - t0))
+
+
+def timed_phase(name):
+    """
+    Method decorator wrapping phase_timer around a fitting phase,
+    storing the records on the object's _timings list.
+    """
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            store = self.__dict__.setdefault('_timings', [])
+            with phase_timer(name, store):
+                return func(self, *args, **kwargs)
+        return inner
+    return wrap
+
+
+def timings_report(store):
+    """
+    Aggregate the (name, dt_ns) records collected by phase_timer into
+    per-phase totals and percentages.
+    Returns:
+    ----------
+        report : str
+            one line per phase, sorted by total time.
+    """
+    totals = {}
+    for name, dt in store:
+        totals[name] = totals.get(name, 0) + dt
+    grand = sum(totals.values())
+    lines = []
+    for name, dt in sorted(totals.items(), key=lambda kv: kv[1], reverse=True):
+        lines.append('{:<16s}{:>12.3f} ms{:>8.1f} %'.format(
+            name, dt/1e6, 100.*dt/grand if grand else 0.))
+    return '\n'.join(lines)
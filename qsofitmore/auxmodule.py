@@ -10,21 +10,16 @@ from uncertainties import ufloat
 from uncertainties.umath import *
 
 
-# Return LaTeX name for a line / complex name
+# LaTeX names for line / complex names, built once at import
+_TEX_NAMES = {'Ha': r'H$\alpha$',
+              'Hb': r'H$\beta$',
+              'Hr': r'H$\gamma$',
+              'Hg': r'H$\gamma$',
+              'Lya': r'Ly$\alpha$'}
+
+
 def texlinename(name) -> str:
-    if name == 'Ha':
-        tname = r'H$\alpha$'
-    elif name == 'Hb':
-        tname = r'H$\beta$'
-    elif name == 'Hr':
-        tname = r'H$\gamma$'
-    elif name == 'Hg':
-        tname = r'H$\gamma$'
-    elif name == 'Lya':
-        tname = r'Ly$\alpha$'
-    else:
-        tname = name
-    return tname
+    return _TEX_NAMES.get(name, name)
 
 
 def designation(ra, dec, telescope=None) -> str:
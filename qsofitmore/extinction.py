@@ -8,6 +8,10 @@ import os
 from astropy import units as u
 from astropy.coordinates import SkyCoord
 
+# dust map query objects keyed by (mapname, mode), built lazily on the
+# first getebv call so the map data are only loaded once per session
+_DUSTMAP_CACHE = {}
+
 
 def wang2019(wave, ebv, waveunit=u.AA, Rv=3.1):
     """wang2019(self, wave, ebv, waveunit=u.AA, Rv=3.1):
@@ -47,6 +51,70 @@ def wang2019(wave, ebv, waveunit=u.AA, Rv=3.1):
     return Alam
 
 
+def ccm89(wave, ebv, waveunit=u.AA, Rv=3.1):
+    """ccm89(wave, ebv, waveunit=u.AA, Rv=3.1):
+    Extinction function given by the law from
+    Cardelli, Clayton & Mathis (1989), evaluated
+    on the whole wavelength array at once.
+    Parameters
+    ----------
+    wave : numpy.ndarray (1-d)
+        Wavelengths.
+    ebv : float
+        E(B-V) in magnitude.
+    waveunit : astropy.units.Quantity
+        Unit of the wavelengths.
+    Rv : float
+        Default: 3.1.
+    Returns
+    -------
+    Alam : numpy.ndarray (1-d)
+        Extinction in magnitudes.
+    Paper information
+    -------
+    bibcode: 1989ApJ...345..245C
+    doi: 10.1086/167900
+    adsurl: https://ui.adsabs.harvard.edu/abs/1989ApJ...345..245C/abstract
+    """
+
+    Av = Rv * ebv
+    uwave = wave * waveunit
+    uwave = uwave.to(u.micron)
+    x = 1 / uwave.value
+    a = np.zeros_like(x)
+    b = np.zeros_like(x)
+    # infrared: 0.3 <= x < 1.1
+    mask = (x >= 0.3) & (x < 1.1)
+    a[mask] = 0.574 * x[mask] ** 1.61
+    b[mask] = -0.527 * x[mask] ** 1.61
+    # optical/NIR: 1.1 <= x < 3.3
+    mask = (x >= 1.1) & (x < 3.3)
+    y = x[mask] - 1.82
+    a[mask] = 1.0 + 0.17699 * y - 0.50447 * y ** 2 - 0.02427 * y ** 3 + \
+        0.72085 * y ** 4 + 0.01979 * y ** 5 - 0.77530 * y ** 6 + \
+        0.32999 * y ** 7
+    b[mask] = 1.41338 * y + 2.28305 * y ** 2 + 1.07233 * y ** 3 - \
+        5.38434 * y ** 4 - 0.62251 * y ** 5 + 5.30260 * y ** 6 - \
+        2.09002 * y ** 7
+    # ultraviolet: 3.3 <= x < 8.0
+    mask = (x >= 3.3) & (x < 8.0)
+    xm = x[mask]
+    Fa = np.zeros_like(xm)
+    Fb = np.zeros_like(xm)
+    fmask = xm >= 5.9
+    Fa[fmask] = -0.04473 * (xm[fmask] - 5.9) ** 2 - 0.009779 * (xm[fmask] - 5.9) ** 3
+    Fb[fmask] = 0.2130 * (xm[fmask] - 5.9) ** 2 + 0.1207 * (xm[fmask] - 5.9) ** 3
+    a[mask] = 1.752 - 0.316 * xm - 0.104 / ((xm - 4.67) ** 2 + 0.341) + Fa
+    b[mask] = -3.090 + 1.825 * xm + 1.206 / ((xm - 4.62) ** 2 + 0.263) + Fb
+    # far-ultraviolet: 8.0 <= x <= 10.0
+    mask = (x >= 8.0) & (x <= 10.0)
+    y = x[mask] - 8.0
+    a[mask] = -1.073 - 0.628 * y + 0.137 * y ** 2 - 0.070 * y ** 3
+    b[mask] = 13.670 + 4.257 * y - 0.420 * y ** 2 + 0.374 * y ** 3
+    Alam = (a + b / Rv) * Av
+    return Alam
+
+
 def getebv(ra, dec, mapname='planck', mode=None):
     """
     Query the dust map with "dustmaps" to get the line-of-sight
@@ -66,18 +134,24 @@ def getebv(ra, dec, mapname='planck', mode=None):
             Default: 'local'.
         """
     coord = SkyCoord(ra=ra*u.deg, dec=dec*u.deg, frame='icrs')
-    if mapname.lower()=='planck':
-        from dustmaps.planck import PlanckQuery
-        planck = PlanckQuery()
-        ebv = planck(coord)
-    elif mapname.lower()=='sfd' and mode=='local':
-        from dustmaps.sfd import SFDQuery
-        sfd = SFDQuery()
-        ebv = sfd(coord)
-    elif mapname.lower=='sfd' and mode=='web':
-        from dustmaps.sfd import SFDWebQuery
-        sfd = SFDWebQuery()
-        ebv = sfd(coord)
+    mapname = mapname.lower()
+    if mode is None:
+        mode = 'local'
+    key = (mapname, mode)
+    if key not in _DUSTMAP_CACHE:
+        if mapname=='planck':
+            from dustmaps.planck import PlanckQuery
+            _DUSTMAP_CACHE[key] = PlanckQuery()
+        elif mapname=='sfd' and mode=='local':
+            from dustmaps.sfd import SFDQuery
+            _DUSTMAP_CACHE[key] = SFDQuery()
+        elif mapname=='sfd' and mode=='web':
+            from dustmaps.sfd import SFDWebQuery
+            _DUSTMAP_CACHE[key] = SFDWebQuery()
+        else:
+            raise ValueError(
+                "mapname should be one of ['sfd', 'planck'].")
+    ebv = _DUSTMAP_CACHE[key](coord)
     return ebv
 
         
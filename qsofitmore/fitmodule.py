@@ -2,8 +2,11 @@
 # from mmap import MAP_ANONYMOUS
 # from os import name
 # from re import T
+import os
 import sys
 import glob
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import matplotlib
 import numpy as np
 import matplotlib.pyplot as plt
@@ -11,7 +14,6 @@ import sfdmap
 from scipy import interpolate
 from scipy import integrate
 from kapteyn import kmpfit
-from PyAstronomy import pyasl
 from astropy.io import fits
 from astropy.cosmology import FlatLambdaCDM
 from astropy.modeling.blackbody import blackbody_lambda
@@ -21,8 +23,13 @@ from astropy import units as u
 from PyQSOFit import QSOFit
 from .extinction import *
 from .auxmodule import *
+from ._profile import timed_phase, timings_report
 import pkg_resources
 import pandas as pd
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 datapath = pkg_resources.resource_filename('PyQSOFit', '/')
 
@@ -31,8 +38,116 @@ __all__ = ['QSOFitNew']
 getnonzeroarr = lambda x: x[x != 0]
 sciplotstyle()
 
+# quantity order of the narrow-line property records, matching the
+# return order of line_prop
+_NA_QUANTITIES = ('fwhm', 'sigma', 'ew', 'peak', 'area')
+
+
+def _na_stats_to_dict(na_stats):
+    """
+    Expand the structured narrow-line record array produced by
+    new_line_mc into the nested {line: {quantity: trials}} dict the
+    downstream result assembly expects, dropping the zero entries of
+    trials (or whole lines) without a qualifying component.
+    """
+    return {str(rec['line']): {q: getnonzeroarr(rec[q])
+                               for q in _NA_QUANTITIES}
+            for rec in na_stats}
+
+# line parameter tables keyed by path, read once per session instead of
+# once per spectrum on the line-fit path
+_LINELIST_CACHE = {}
+
+# line markers drawn by _PlotFig; constant across spectra, so built once
+# at import instead of per figure
+_LINE_CEN = np.array(
+    [6564.60, 6549.85, 6585.27, 6718.29, 6732.66, 4862.68, 5008.24, 4687.02, 4341.68, 3934.78, 3728.47,
+     3426.84, 2798.75, 1908.72, 1816.97, 1750.26, 1718.55, 1549.06, 1640.42, 1402.06, 1396.76, 1335.30,
+     1215.67])
+
+_LINE_NAME = np.array(
+    ['', '', r'H$\alpha$+[NII]', '', '[SII]6718,6732', r'H$\beta$', '[OIII]', 'HeII4687', r'H$\gamma$',
+     'CaII3934', '[OII]3728',
+     'NeV3426', 'MgII', 'CIII]', 'SiII1816', 'NIII]1750', 'NIV]1718', 'CIV', 'HeII1640', '', 'SiIV+OIV',
+     'CII1335', r'Ly$\alpha$'])
+
+
+def _manygauss(xval, pp):
+    """
+    Evaluate the sum of ngauss Gaussians at xval (natural log of
+    wavelength). Kept free of any class state so that it can be
+    JIT-compiled with numba; falls back to the pure NumPy loop when
+    numba is not installed.
+    """
+    ngauss = pp.shape[0]//3
+    yval = np.zeros_like(xval)
+    for i in range(ngauss):
+        yval += pp[3*i]*np.exp(-(xval-pp[3*i+1])**2/(2.*pp[3*i+2]**2))
+    return yval
+
+
+if njit is not None:
+    _manygauss = njit(cache=True, fastmath=True)(_manygauss)
+
+
+# the narrow-line kernel lives in _kernels so that the AOT build
+# script can import it without pulling in the fitting dependencies;
+# prefer the precompiled extension (built with _kernels_aot), then
+# the JIT, then the plain NumPy version
+try:
+    from .qsofit_kernels import narrow_line_prop as _narrow_line_prop_core
+except ImportError:
+    from ._kernels import narrow_line_prop_core as _narrow_line_prop_core
+    if njit is not None:
+        _narrow_line_prop_core = njit(cache=True, fastmath=True)(_narrow_line_prop_core)
+
+
+def _warm_worker():
+    """Pool initializer: pre-warm the numba JIT in each worker."""
+    if njit is not None:
+        _manygauss(np.zeros(8), np.zeros(3))
+
+
+def _fit_one(obj, fit_kwargs):
+    """
+    Fit a single QSOFitNew object with the given Fit() keywords and
+    return the picklable part of its state. The kmpfit fitters held
+    by a fitted object cannot cross process boundaries, so `fit_batch`
+    rebuilds its local objects from the returned state instead.
+    """
+    obj.Fit(**fit_kwargs)
+    return obj.__getstate__()
+
+
+def _run_one_mc_trial(obj, flux, x, err, pp0, pp_limits):
+    """
+    Run a single Monte Carlo trial of the emission line fit.
+    Defined at module level so that `new_line_mc` can dispatch
+    trials to worker processes when `n_jobs` > 1.
+    Parameters:
+    ----------
+        obj : QSOFitNew
+            the fitting object (pickled into workers).
+        flux : 1-D array
+            the perturbed flux of this trial, drawn from the batched
+            noise matrix generated in `new_line_mc`.
+    Returns:
+    ----------
+        params : the fitted (tied) parameters of the trial. Line
+            properties are computed over the whole parameter stack at
+            once by `_line_prop_mc` after the trials complete.
+    """
+    line_fit = kmpfit.Fitter(residuals=obj._residuals_line, data=(x, flux, err), maxiter=50)
+    line_fit.parinfo = pp_limits
+    line_fit.fit(params0=pp0)
+    return np.asarray(obj.newpp)
+
 class QSOFitNew(QSOFit):
 
+    # SFDMap instances keyed by dustmap_path, shared across objects so
+    # that the map tiles are only read from disk once per session
+    _sfdmap_cache = {}
+
     def __init__(self, lam, flux, err, z, ra=- 999., dec=-999., name=None, plateid=None, mjd=None, fiberid=None, 
                  path=None, and_mask=None, or_mask=None, is_sdss=True):
         """
@@ -79,11 +194,26 @@ class QSOFitNew(QSOFit):
         self.plateid = plateid
         self.mjd = mjd
         self.fiberid = fiberid
-        self.path = path    
+        self.path = path
         self.is_sdss = is_sdss
+        if njit is not None:
+            # pre-warm the JIT so the compile cost is not paid inside
+            # the first kmpfit iteration
+            _manygauss(np.zeros(8), np.zeros(3))
+
+    def __getstate__(self):
+        # kmpfit.Fitter holds C-level mpfit state and cannot be
+        # pickled; drop the fitters and the caches derived from them
+        # so objects can cross process boundaries (new_line_mc and
+        # fit_batch with n_jobs > 1)
+        state = self.__dict__.copy()
+        for key in ('conti_fit', 'line_fit',
+                    '_conti_grid_cache', '_mc_noise_buf'):
+            state.pop(key, None)
+        return state
 
     @classmethod
-    def fromiraf(cls, fname, redshift=None, path=None, plateid=None, mjd=None, fiberid=None, 
+    def fromiraf(cls, fname, redshift=None, path=None, plateid=None, mjd=None, fiberid=None,
                  ra=None, dec=None, telescope=None):
         """
         Initialize QSOFit object from a custom fits file
@@ -144,34 +274,34 @@ class QSOFitNew(QSOFit):
                 mjd = float(header['mjd'])
             except:
                 pass
-        CRVAL1 = float(header['CRVAL1'])
-        CD1_1 = float(header['CD1_1'])
-        CRPIX1 = float(header['CRPIX1'])
+        # the WCS cards already come back as floats from astropy
+        CRVAL1 = header['CRVAL1']
+        CD1_1 = header['CD1_1']
+        CRPIX1 = header['CRPIX1']
         data = hdu[0].data
         dim = len(data.shape)
         if dim==1:
             l = len(data)
-            wave = np.linspace(CRVAL1, 
-                               CRVAL1 + (l - CRPIX1) * CD1_1, 
+            wave = np.linspace(CRVAL1,
+                               CRVAL1 + (l - CRPIX1) * CD1_1,
                                l)
             wave = wave.flatten()
-            flux = data.flatten()
+            flux = np.ascontiguousarray(data.flatten()*1e17, dtype=np.float64)
             err = None
         elif dim==3:
             l = data.shape[2]
             print(repr(l))
-            wave = np.linspace(CRVAL1, 
-                               CRVAL1 + (l - CRPIX1) * CD1_1, 
+            wave = np.linspace(CRVAL1,
+                               CRVAL1 + (l - CRPIX1) * CD1_1,
                                l)
-            flux = data[0,0,:]
-            err = data[3,0,:]
+            # the multispec rows are non-contiguous views; fuse the
+            # unit scaling with the contiguous copy
+            flux = np.ascontiguousarray(data[0,0,:]*1e17, dtype=np.float64)
+            err = np.ascontiguousarray(data[3,0,:]*1e17, dtype=np.float64)
         else:
             raise NotImplementedError("The IRAF spectrum has yet to be provided, not implemented.")
-        hdu.close() 
-        flux *= 1e17
-        if err is not None:
-            err *= 1e17
-        return cls(lam=wave, flux=flux, err=err, z=redshift, ra=ra, dec=dec, name=name, plateid=plateid, 
+        hdu.close()
+        return cls(lam=wave, flux=flux, err=err, z=redshift, ra=ra, dec=dec, name=name, plateid=plateid,
                    mjd=mjd, fiberid=fiberid, path=path, is_sdss=False)
 
     @classmethod
@@ -254,6 +384,90 @@ class QSOFitNew(QSOFit):
         return cls(lam=wave, flux=flux, err=err, z=redshift, ra=ra, dec=dec, name=name, plateid=plateid, 
                    mjd=mjd, fiberid=fiberid, path=path, is_sdss=False)
 
+    @classmethod
+    def fit_batch(cls, spectra, n_jobs=1, **fit_kwargs):
+        """
+        Fit a list of spectra, amortizing the fixed per-spectrum costs
+        (dust map queries, line table I/O, JIT warmup) and dispatching
+        the fits to a process pool.
+        Parameters:
+        ----------
+            spectra : list of QSOFitNew
+                the objects to fit.
+            n_jobs : int
+                number of worker processes. Default 1 (serial).
+        Returns:
+        ----------
+            tab : astropy.table.Table
+                one row per object with the continuum and line results.
+            fitted : list of QSOFitNew
+                the fitted objects, in input order.
+        Other parameters:
+        ----------
+            fit_kwargs : dict
+                keyword arguments passed through to Fit().
+        Example:
+        ----------
+        tab, fitted = QSOFitNew.fit_batch(spectra, n_jobs=4, MC=False)
+        """
+        spectra = list(spectra)
+        if len(spectra) == 0:
+            return Table(), []
+        # one vectorized E(B-V) query per dust map for all coordinates;
+        # _DeRedden skips its own lookup when self.ebv is already set.
+        # Objects left at the ra/dec sentinel (-999) cannot be queried,
+        # and there is nothing to prequery when dereddening is off
+        if fit_kwargs.get('deredden', True):
+            mapnames = {getattr(s, 'mapname', 'sfd') for s in spectra}
+            for mapname in mapnames:
+                idx = [i for i, s in enumerate(spectra)
+                       if getattr(s, 'mapname', 'sfd') == mapname
+                       and s.ra != -999. and s.dec != -999.]
+                if len(idx) == 0:
+                    continue
+                ras = np.array([spectra[i].ra for i in idx])
+                decs = np.array([spectra[i].dec for i in idx])
+                try:
+                    ebvs = np.atleast_1d(getebv(ras, decs, mapname=mapname))
+                except Exception:
+                    # missing dustmaps package or unfetched map data;
+                    # _DeRedden falls back per object
+                    continue
+                for i, ebv in zip(idx, ebvs):
+                    spectra[i].ebv = float(ebv)
+        # preload the line parameter tables once
+        for fname in {s.path+'qsopar.fits' for s in spectra if s.path is not None}:
+            try:
+                key = (fname, os.path.getmtime(fname))
+                if key not in _LINELIST_CACHE:
+                    _LINELIST_CACHE[key] = fits.getdata(fname, ext=1)
+            except (OSError, IndexError):
+                pass
+        worker = partial(_fit_one, fit_kwargs=fit_kwargs)
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs,
+                                     initializer=_warm_worker) as executor:
+                states = list(executor.map(worker, spectra))
+        else:
+            states = [worker(s) for s in spectra]
+        # workers return plain picklable state (the fitters cannot be
+        # pickled back); rebuild the fitted objects locally from it
+        fitted = spectra
+        for s, state in zip(fitted, states):
+            s.__dict__.update(state)
+        rows = []
+        for s in fitted:
+            row = {'name': s.name, 'ra': s.ra, 'dec': s.dec, 'z': s.z}
+            for names, vals in ((getattr(s, 'conti_result_name', None),
+                                 getattr(s, 'conti_result', None)),
+                                (getattr(s, 'line_result_name', None),
+                                 getattr(s, 'line_result', None))):
+                if names is not None:
+                    row.update(dict(zip(names, vals)))
+            rows.append(row)
+        tab = Table.from_pandas(pd.DataFrame(rows))
+        return tab, fitted
+
     def setmapname(self, mapname):
         """
         Parameters:
@@ -264,6 +478,7 @@ class QSOFitNew(QSOFit):
         mapname = str(mapname).lower()
         self.mapname = mapname
 
+    @timed_phase('_DeRedden')
     def _DeRedden(self, lam, flux, err, ra, dec, dustmap_path):
         """Correct the Galactic extinction"""
         try:
@@ -273,34 +488,37 @@ class QSOFitNew(QSOFit):
             mapname = 'sfd'
             self.mapname = mapname
         if self.mapname == 'sfd':
-            m = sfdmap.SFDMap(dustmap_path)
-            zero_flux = np.where(flux == 0, True, False)
-            flux[zero_flux] = 1e-10
-            flux_unred = pyasl.unred(lam, flux, m.ebv(ra, dec))
-            err_unred = err*flux_unred/flux
-            flux_unred[zero_flux] = 0
-            del self.flux, self.err
-            self.flux = flux_unred
-            self.err = err_unred
+            if getattr(self, 'ebv', None) is None:
+                try:
+                    # query the preloaded dustmaps SFD map, which accepts
+                    # scalar or array coordinates in a single call
+                    self.ebv = getebv(ra, dec, mapname=self.mapname)
+                except Exception:
+                    # fall back to the sfdmap reader at dustmap_path when
+                    # the dustmaps package is not available or its SFD
+                    # data were never fetched into its data directory
+                    if dustmap_path not in self._sfdmap_cache:
+                        self._sfdmap_cache[dustmap_path] = sfdmap.SFDMap(dustmap_path)
+                    self.ebv = self._sfdmap_cache[dustmap_path].ebv(ra, dec)
+            Alam = ccm89(lam, self.ebv)
+            self.flux = deredden(Alam, flux)
+            self.err = deredden(Alam, err)
         elif self.mapname == 'planck':
-            self.ebv = getebv(self.ra, self.dec, mapname=self.mapname)
+            if getattr(self, 'ebv', None) is None:
+                self.ebv = getebv(self.ra, self.dec, mapname=self.mapname)
             Alam = wang2019(self.lam, self.ebv)
-            zero_flux = np.where(flux == 0, True, False)
-            flux[zero_flux] = 1e-10
-            flux_unred = deredden(Alam, self.flux) 
-            err_unred = err*flux_unred/flux
-            flux_unred[zero_flux] = 0
-            del self.flux, self.err
-            self.flux = flux_unred
-            self.err = err_unred           
+            self.flux = deredden(Alam, flux)
+            self.err = deredden(Alam, err)
         return self.flux
 
 
+    @timed_phase('_HostDecompose')
     def _HostDecompose(self, wave, flux, err, z, Mi, npca_gal, npca_qso, path):
         path = datapath
         return super()._HostDecompose(wave, flux, err, z, Mi, npca_gal, npca_qso, path)
 
     
+    @timed_phase('_DoContiFit')
     def _DoContiFit(self, wave, flux, err, ra, dec, plateid, mjd, fiberid):
         if self.plateid is None:
             plateid = 0
@@ -320,8 +538,9 @@ class QSOFitNew(QSOFit):
             Fe_flux_range=None, poly=False, BC=False, rej_abs=False, initial_guess=None, MC=True, n_trails=1,
             linefit=True, tie_lambda=True, tie_width=True, tie_flux_1=True, tie_flux_2=True, save_result=True,
             plot_fig=True, save_fig=True, plot_line_name=True, plot_legend=True, dustmap_path=None, save_fig_path=None,
-            save_fits_path=None, save_fits_name=None, mask_compname=None):
+            save_fits_path=None, save_fits_name=None, mask_compname=None, n_jobs=1):
         self.mask_compname = mask_compname
+        self.n_jobs = n_jobs
         if name is None and save_fits_name is not None:
             name = save_fits_name
             print("Name is now {}.".format(name))
@@ -346,6 +565,15 @@ class QSOFitNew(QSOFit):
                            save_fits_name=save_fits_name)
 
 
+    def timings_report(self):
+        """
+        Print the per-phase wall-clock aggregation collected by the
+        timed_phase hooks. Only populated when the environment
+        variable QSOFITMORE_PROFILE is set to 1.
+        """
+        print(timings_report(self.__dict__.get('_timings', [])))
+
+    @timed_phase('_PlotFig')
     def _PlotFig(self, ra, dec, z, wave, flux, err, decomposition_host, linefit, tmp_all, gauss_result, f_conti_model,
                  conti_fit, all_comp_range, uniq_linecomp_sort, line_flux, save_fig_path):
         """Plot the results"""
@@ -365,23 +593,25 @@ class QSOFitNew(QSOFit):
             else:
                 mc_flag = 1
             
-            lines_total = np.zeros_like(wave)
             line_order = {'r': 3, 'g': 7}  # to make the narrow line plot above the broad line
-            
-            temp_gauss_result = gauss_result
-            for p in range(int(len(temp_gauss_result)/mc_flag/3)):
-                # warn that the width used to separate narrow from broad is not exact 1200 km s-1 which would lead to wrong judgement
-                if self.CalFWHM(temp_gauss_result[(2+p*3)*mc_flag]) < 1200.:
-                    color = 'g'
-                else:
-                    color = 'r'
-                
-                line_single = self.Onegauss(np.log(wave), temp_gauss_result[p*3*mc_flag:(p+1)*3*mc_flag:mc_flag])
-                
+
+            # evaluate all Gaussian components at once by broadcasting
+            # over an (N_gauss, N_pix) grid instead of calling Onegauss
+            # once per component
+            pp_gauss = gauss_result[::mc_flag].reshape(-1, 3)
+            scale, center, sigma = pp_gauss[:, 0], pp_gauss[:, 1], pp_gauss[:, 2]
+            logw = np.log(wave)[None, :]
+            gauss_mat = scale[:, None]*np.exp(-0.5*((logw-center[:, None])/sigma[:, None])**2)
+            lines_total = gauss_mat.sum(axis=0)
+            # warn that the width used to separate narrow from broad is not exact 1200 km s-1 which would lead to wrong judgement
+            colors = np.where(self.CalFWHM(sigma) < 1200., 'g', 'r')
+            for p in range(pp_gauss.shape[0]):
+                color = colors[p]
+                line_single = gauss_mat[p]
+
                 ax.plot(wave, line_single+f_conti_model, color=color, zorder=5)
                 for c in range(self.ncomp):
                     axn[1][c].plot(wave, line_single, color=color, zorder=line_order[color])
-                lines_total += line_single
             
             ax.plot(wave, lines_total+f_conti_model, 'b', label='line',
                     zorder=6)  # supplement the emission lines in the firs subplot
@@ -391,10 +621,11 @@ class QSOFitNew(QSOFit):
                 axn[1][c].plot(wave, self.line_flux, 'k', zorder=0)
                 
                 axn[1][c].set_xlim(all_comp_range[2*c:2*c+2])
-                f_max = line_flux[
-                    np.where((wave > all_comp_range[2*c]) & (wave < all_comp_range[2*c+1]), True, False)].max()
-                f_min = line_flux[
-                    np.where((wave > all_comp_range[2*c]) & (wave < all_comp_range[2*c+1]), True, False)].min()
+                lo = np.searchsorted(wave, all_comp_range[2*c], side='right')
+                hi = np.searchsorted(wave, all_comp_range[2*c+1], side='left')
+                region_c = line_flux[lo:hi]
+                f_max = region_c.max()
+                f_min = region_c.min()
                 axn[1][c].set_ylim(f_min*0.9, f_max*1.1)
                 axn[1][c].set_xticks([all_comp_range[2*c], np.round((all_comp_range[2*c]+all_comp_range[2*c+1])/2, -1),
                                       all_comp_range[2*c+1]])
@@ -430,9 +661,7 @@ class QSOFitNew(QSOFit):
         ax.plot(wave, f_conti_model, 'c', lw=2, label='FeII', zorder=7)
         if self.BC == True:
             ax.plot(wave, self.f_pl_model+self.f_poly_model+self.f_bc_model, 'y', lw=2, label='BC', zorder=8)
-        ax.plot(wave,
-                conti_fit.params[6]*(wave/3000.0)**conti_fit.params[7]+self.F_poly_conti(wave, conti_fit.params[11:]),
-                color='orange', lw=2, label='conti', zorder=9)
+        ax.plot(wave, self.PL_poly, color='orange', lw=2, label='conti', zorder=9)
         if self.decomposed == False:
             plot_bottom = flux.min()
         else:
@@ -445,17 +674,9 @@ class QSOFitNew(QSOFit):
         
         # plot line name--------
         if self.plot_line_name == True:
-            line_cen = np.array(
-                [6564.60, 6549.85, 6585.27, 6718.29, 6732.66, 4862.68, 5008.24, 4687.02, 4341.68, 3934.78, 3728.47,
-                 3426.84, 2798.75, 1908.72, 1816.97, 1750.26, 1718.55, 1549.06, 1640.42, 1402.06, 1396.76, 1335.30, \
-                 1215.67])
-            
-            line_name = np.array(
-                ['', '', r'H$\alpha$+[NII]', '', '[SII]6718,6732', r'H$\beta$', '[OIII]', 'HeII4687', r'H$\gamma$', 
-                 'CaII3934', '[OII]3728',
-                 'NeV3426', 'MgII', 'CIII]', 'SiII1816', 'NIII]1750', 'NIV]1718', 'CIV', 'HeII1640', '', 'SiIV+OIV',
-                 'CII1335', r'Ly$\alpha$'])
-            
+            line_cen = _LINE_CEN
+            line_name = _LINE_NAME
+
             for ll in range(len(line_cen)):
                 if wave.min() < line_cen[ll] < wave.max():
                     ax.plot([line_cen[ll], line_cen[ll]], [plot_bottom*0.9, self.flux_prereduced.max()*1.1], 'k:')
@@ -480,25 +701,163 @@ class QSOFitNew(QSOFit):
         # plt.close()
     
 
+    def _conti_on_loggrid(self, xx):
+        """
+        Evaluate the continuum model (power law + polynomial + Balmer
+        continuum) on a grid of natural-log wavelengths, in one
+        vectorized pass over the whole grid. The continuum parameters
+        are fixed once _DoContiFit has run, so evaluations are cached
+        per grid and shared by the Monte Carlo trials of a complex,
+        which all integrate over the same grid.
+        """
+        cache = getattr(self, '_conti_grid_cache', None)
+        if cache is None or cache[0] is not self.conti_fit:
+            cache = (self.conti_fit, {})
+            self._conti_grid_cache = cache
+        key = (float(xx[0]), float(xx[-1]), len(xx))
+        grids = cache[1]
+        if key not in grids:
+            w = np.exp(xx)
+            pp = self.conti_fit.params
+            grids[key] = pp[6]*(w/3000.0)**pp[7]+self.F_poly_conti(w, pp[11:]) + \
+                self.Balmer_conti(w, pp[8:11])
+        return grids[key]
+
+    def _narrow_line_prop(self, linecenter, pp, logw_conti, conti):
+        """
+        line_prop(..., 'narrow') equivalent for a single Gaussian,
+        dispatched to the JIT-compiled kernel. logw_conti/conti is the
+        dense continuum table the kernel interpolates from; build it
+        once per complex with _conti_on_loggrid.
+        """
+        pp = np.asarray(pp, dtype=np.float64)
+        return _narrow_line_prop_core(float(linecenter), pp[0], pp[1], pp[2],
+                                      logw_conti, conti)
+
+    def _line_prop_mc(self, compcenter, params_stack, linetype):
+        """
+        Vectorized line_prop over a stack of Monte Carlo parameter
+        vectors. Instead of integrating the profile once per trial,
+        all trials are evaluated on one shared natural-log wavelength
+        grid of shape (n_trails, npix) and reduced with np.trapz along
+        the grid axis.
+        Parameters:
+        ----------
+            compcenter : float
+                theoretical vacuum wavelength of the line (complex).
+            params_stack : 2-D array with shape (n_trails, n_params)
+                one fitted [scale, centerwave, sigma]*ngauss vector
+                per trial.
+            linetype : str
+                'broad' or 'narrow', selecting components with the
+                same sigma threshold as line_prop.
+        Returns:
+        ----------
+            (fwhm, sigma, ew, peak, area) : 1-D arrays of length
+                n_trails. Trials without a selected component (or with
+                an all-zero profile) give zeros, as line_prop does.
+        """
+        c = 299792.458  # km/s
+        pp = np.asarray(params_stack, dtype=np.float64)
+        n_trails = pp.shape[0]
+        scale = pp[:, 0::3]
+        cen = pp[:, 1::3]
+        sig = pp[:, 2::3]
+        if linetype == 'broad':
+            sel = sig > 0.0017
+        elif linetype == 'narrow':
+            sel = sig <= 0.0017
+        else:
+            raise RuntimeError("line type should be 'broad' or 'narrow'!")
+        sel[:, 3:] = False  # to exclude the broad OIII and broad He II
+        fwhm = np.zeros(n_trails)
+        sigma = np.zeros(n_trails)
+        ew = np.zeros(n_trails)
+        peak = np.zeros(n_trails)
+        area = np.zeros(n_trails)
+        if not sel.any():
+            return fwhm, sigma, ew, peak, area
+        # one grid covering the selected components of all trials
+        left = np.min(np.where(sel, cen-3*sig, np.inf))
+        right = np.max(np.where(sel, cen+3*sig, -np.inf))
+        disp = 1.e-4*np.log(10)
+        npix = int((right-left)/disp)
+        if npix < 2:
+            return fwhm, sigma, ew, peak, area
+        xx = np.linspace(left, right, npix)
+        amp = np.where(sel, scale, 0.)
+        sig_safe = np.where(sig == 0, 1., sig)
+        yy = np.sum(amp[:, :, None]*np.exp(
+            -(xx[None, None, :]-cen[:, :, None])**2/(2.*sig_safe[:, :, None]**2)), axis=1)
+        wave_grid = np.exp(xx)
+        contiflux = self._conti_on_loggrid(xx)
+        ymax = yy.max(axis=1)
+        good = sel.any(axis=1) & (ymax > 0)
+        if linetype == 'narrow':
+            # the shared grid hides line_prop's npix < 10 cutoff, so
+            # zero out trials whose own +/-3 sigma span is below it
+            # (broad spans always cover far more than 10 points)
+            good &= (6.*sig[:, 0]/disp).astype(int) >= 10
+        peak_ind = np.argmax(yy, axis=1)
+        peak[good] = wave_grid[peak_ind[good]]
+        # half-maximum crossings, refined linearly between grid points
+        half = 0.5*ymax
+        above = yy >= half[:, None]
+        rows = np.arange(n_trails)
+        il = np.argmax(above, axis=1)
+        ir = npix-1-np.argmax(above[:, ::-1], axis=1)
+        il0 = np.maximum(il-1, 0)
+        ir1 = np.minimum(ir+1, npix-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dy = yy[rows, il]-yy[rows, il0]
+            frac = np.where(dy != 0, (half-yy[rows, il0])/dy, 0.)
+            xl = xx[il0]+frac*(xx[il]-xx[il0])
+            dy = yy[rows, ir]-yy[rows, ir1]
+            frac = np.where(dy != 0, (yy[rows, ir]-half)/dy, 0.)
+            xr = xx[ir]+frac*(xx[ir1]-xx[ir])
+            fwhm[good] = (np.abs(np.exp(xr)-np.exp(xl))/compcenter*c)[good]
+            # line sigma and EW in normal wavelength
+            lambda0 = np.trapz(yy, wave_grid, axis=1)
+            lambda1 = np.trapz(yy*wave_grid, wave_grid, axis=1)
+            lambda2 = np.trapz(yy*wave_grid*wave_grid, wave_grid, axis=1)
+            sigma_all = np.sqrt(lambda2/lambda0-(lambda1/lambda0)**2)/compcenter*c
+            ew_all = np.trapz(np.abs(yy/contiflux), wave_grid, axis=1)
+        area[good] = lambda0[good]
+        sigma[good] = sigma_all[good]
+        ew[good] = ew_all[good]
+        return fwhm, sigma, ew, peak, area
+
     # line function-----------
+    def Manygauss(self, xval, pp):
+        """The multi-Gaussian model used to fit the emission lines.
+        Dispatches to the module-level kernel, which is JIT-compiled
+        with numba when available."""
+        return _manygauss(np.asarray(xval, dtype=np.float64),
+                          np.asarray(pp, dtype=np.float64))
+
+    @timed_phase('_DoLineFit')
     def _DoLineFit(self, wave, line_flux, err, f):
         """Fit the emission lines with Gaussian profile """
         
         # remove abosorbtion line in emission line region
         # remove the pixels below continuum 
-        ind_neg_line = ~np.where(((((wave > 2700.) & (wave < 2900.)) | ((wave > 1700.) & (wave < 1970.)) | (
+        ind_neg_line = ~((((wave > 2700.) & (wave < 2900.)) | ((wave > 1700.) & (wave < 1970.)) | (
                 (wave > 1500.) & (wave < 1700.)) | ((wave > 1290.) & (wave < 1450.)) | (
-                                           (wave > 1150.) & (wave < 1290.))) & (line_flux < -err)), True, False)
+                                           (wave > 1150.) & (wave < 1290.))) & (line_flux < -err))
         
-        # read line parameter
-        linepara = fits.open(self.path+'qsopar.fits')
-        linelist = linepara[1].data
+        # read line parameter; the cache key includes the file mtime so
+        # a qsopar.fits regenerated in-session is picked up on refit
+        linelist_fname = self.path+'qsopar.fits'
+        linelist_key = (linelist_fname, os.path.getmtime(linelist_fname))
+        if linelist_key not in _LINELIST_CACHE:
+            _LINELIST_CACHE[linelist_key] = fits.getdata(linelist_fname, ext=1)
+        linelist = _LINELIST_CACHE[linelist_key]
         mask_compname = self.mask_compname
         if mask_compname is not None:
             linelist = linelist[linelist['compname']!=mask_compname]
         self.linelist = linelist
         
-        ind_kind_line = np.where((linelist['lambda'] > wave.min()) & (linelist['lambda'] < wave.max()), True, False)
+        ind_kind_line = (linelist['lambda'] > wave.min()) & (linelist['lambda'] < wave.max())
         if ind_kind_line.any() == True:
             # sort complex name with line wavelength
             uniq_linecomp, uniq_ind = np.unique(linelist['compname'][ind_kind_line], return_index=True)
@@ -509,36 +868,49 @@ class QSOFitNew(QSOFit):
             
             # loop over each complex and fit n lines simutaneously
             
-            comp_result = np.array([])
-            comp_result_type = np.array([])
-            comp_result_name = np.array([])
-            gauss_result = np.array([])
-            gauss_result_type = np.array([])
-            gauss_result_name = np.array([])
-            all_comp_range = np.array([])
-            fur_result = np.array([])
-            fur_result_type = np.array([])
-            fur_result_name = np.array([])
+            # per-complex pieces are collected in lists and concatenated
+            # once after the loop, avoiding the O(ncomp^2) array growth
+            # of repeated np.concatenate calls
+            comp_result_parts = []
+            comp_result_type_parts = []
+            comp_result_name_parts = []
+            gauss_result_parts = []
+            gauss_result_type_parts = []
+            gauss_result_name_parts = []
+            all_comp_range_parts = []
+            fur_result_parts = []
+            fur_result_type_parts = []
+            fur_result_name_parts = []
             self.na_all_dict = {}
-            
+            # spectra come wavelength-sorted, which lets the component
+            # bounds be found with searchsorted instead of comparing
+            # the full wave array once per complex
+            wave_is_sorted = bool(np.all(np.diff(wave) >= 0))
+
             for ii in range(ncomp):
                 compcenter = allcompcenter[ii]
-                ind_line = np.where(linelist['compname'] == uniq_linecomp_sort[ii], True, False)  # get line index
+                ind_line = (linelist['compname'] == uniq_linecomp_sort[ii])  # get line index
                 linecompname = uniq_linecomp_sort[ii]
                 nline_fit = np.sum(ind_line)  # n line in one complex
                 linelist_fit = linelist[ind_line]
                 # n gauss in each line
-                ngauss_fit = np.asarray(linelist_fit['ngauss'], dtype=int)
+                ngauss_fit = np.ascontiguousarray(linelist_fit['ngauss'], dtype=np.intp)
                 
                 # for iitmp in range(nline_fit):   # line fit together
                 comp_range = [linelist_fit[0]['minwav'], linelist_fit[0]['maxwav']]  # read complex range from table
-                all_comp_range = np.concatenate([all_comp_range, comp_range])
+                all_comp_range_parts.append(np.asarray(comp_range))
                 
                 # ----tie lines--------
                 self._do_tie_line(linelist, ind_line)
                 
                 # get the pixel index in complex region and remove negtive abs in line region
-                ind_n = np.where((wave > comp_range[0]) & (wave < comp_range[1]) & (ind_neg_line == True), True, False)
+                if wave_is_sorted:
+                    lo = np.searchsorted(wave, comp_range[0], side='right')
+                    hi = np.searchsorted(wave, comp_range[1], side='left')
+                    ind_n = np.zeros(len(wave), dtype=bool)
+                    ind_n[lo:hi] = ind_neg_line[lo:hi]
+                else:
+                    ind_n = (wave > comp_range[0]) & (wave < comp_range[1]) & ind_neg_line
                 
                 if np.sum(ind_n) > 10:
                     # call kmpfit for lines
@@ -568,33 +940,39 @@ class QSOFitNew(QSOFit):
                         dof_fix += np.max((len(self.ind_tie_findex2), 1))-1
                     
                     comp_result_tmp = np.array(
-                        [[linelist['compname'][ind_line][0]], [line_fit.status], [line_fit.chi2_min],
-                         [line_fit.chi2_min/(line_fit.dof+dof_fix)], [line_fit.niter],
-                         [line_fit.dof+dof_fix]]).flatten()
+                        [linelist['compname'][ind_line][0], line_fit.status, line_fit.chi2_min,
+                         line_fit.chi2_min/(line_fit.dof+dof_fix), line_fit.niter,
+                         line_fit.dof+dof_fix], dtype=object)
                     comp_result_type_tmp = np.array(['str', 'int', 'float', 'float', 'int', 'int'])
                     comp_result_name_tmp = np.array(
                         [str(ii+1)+'_complex_name', str(ii+1)+'_line_status', str(ii+1)+'_line_min_chi2',
                          str(ii+1)+'_line_red_chi2', str(ii+1)+'_niter', str(ii+1)+'_ndof'])
-                    comp_result = np.concatenate([comp_result, comp_result_tmp])
-                    comp_result_name = np.concatenate([comp_result_name, comp_result_name_tmp])
-                    comp_result_type = np.concatenate([comp_result_type, comp_result_type_tmp])
+                    comp_result_parts.append(comp_result_tmp)
+                    comp_result_name_parts.append(comp_result_name_tmp)
+                    comp_result_type_parts.append(comp_result_type_tmp)
                     
                     # gauss result -------------
                     
-                    gauss_tmp = np.array([])
                     gauss_type_tmp = np.array([])
                     gauss_name_tmp = np.array([])
-                    
-                    for gg in range(len(line_fit.params)):
-                        gauss_tmp = np.concatenate([gauss_tmp, np.array([line_fit.params[gg]])])
-                        if self.MC == True and self.n_trails > 0:
-                            gauss_tmp = np.concatenate([gauss_tmp, np.array([all_para_std[gg]])])
-                    gauss_result = np.concatenate([gauss_result, gauss_tmp])
+
+                    # interleave the fitted values (and their MC stds)
+                    # with strided writes into a preallocated array
+                    nparams = len(line_fit.params)
+                    stride = 2 if (self.MC == True and self.n_trails > 0) else 1
+                    gauss_tmp = np.empty(nparams*stride)
+                    gauss_tmp[0::stride] = line_fit.params
+                    if stride == 2:
+                        gauss_tmp[1::stride] = all_para_std
+                    gauss_result_parts.append(gauss_tmp)
                     
                     # gauss result name -----------------
+                    # plain U-dtype array: one C-level load per access
+                    # instead of going through the Table column per name
+                    linenames_fit = np.asarray(linelist['linename'])[ind_line]
                     for n in range(nline_fit):
-                        for nn in range(int(ngauss_fit[n])):
-                            line_name = linelist['linename'][ind_line][n]+'_'+str(nn+1)
+                        for nn in range(ngauss_fit[n]):
+                            line_name = linenames_fit[n]+'_'+str(nn+1)
                             if self.MC == True and self.n_trails > 0:
                                 gauss_type_tmp_tmp = ['float', 'float', 'float', 'float', 'float', 'float']
                                 gauss_name_tmp_tmp = [line_name+'_scale', line_name+'_scale_err',
@@ -605,8 +983,8 @@ class QSOFitNew(QSOFit):
                                 gauss_name_tmp_tmp = [line_name+'_scale', line_name+'_centerwave', line_name+'_sigma']
                             gauss_name_tmp = np.concatenate([gauss_name_tmp, gauss_name_tmp_tmp])
                             gauss_type_tmp = np.concatenate([gauss_type_tmp, gauss_type_tmp_tmp])
-                    gauss_result_type = np.concatenate([gauss_result_type, gauss_type_tmp])
-                    gauss_result_name = np.concatenate([gauss_result_name, gauss_name_tmp])
+                    gauss_result_type_parts.append(gauss_type_tmp)
+                    gauss_result_name_parts.append(gauss_name_tmp)
                     
                     # further line parameters ----------
                     fur_result_tmp = np.array([])
@@ -633,13 +1011,34 @@ class QSOFitNew(QSOFit):
                         fur_result_name_tmp = np.array(
                             [br_name+'_whole_br_fwhm', br_name+'_whole_br_sigma', br_name+'_whole_br_ew',
                              br_name+'_whole_br_peak', br_name+'_whole_br_area'])
-                    fur_result = np.concatenate([fur_result, fur_result_tmp])
-                    fur_result_type = np.concatenate([fur_result_type, fur_result_type_tmp])
-                    fur_result_name = np.concatenate([fur_result_name, fur_result_name_tmp])
-                
+                    fur_result_parts.append(fur_result_tmp)
+                    fur_result_type_parts.append(fur_result_type_tmp)
+                    fur_result_name_parts.append(fur_result_name_tmp)
+
                 else:
                     print("less than 10 pixels in line fitting!")
-            
+
+            if comp_result_parts:
+                comp_result = np.concatenate(comp_result_parts)
+                comp_result_type = np.concatenate(comp_result_type_parts)
+                comp_result_name = np.concatenate(comp_result_name_parts)
+                gauss_result = np.concatenate(gauss_result_parts)
+                gauss_result_type = np.concatenate(gauss_result_type_parts)
+                gauss_result_name = np.concatenate(gauss_result_name_parts)
+                fur_result = np.concatenate(fur_result_parts)
+                fur_result_type = np.concatenate(fur_result_type_parts)
+                fur_result_name = np.concatenate(fur_result_name_parts)
+            else:
+                comp_result = np.array([])
+                comp_result_type = np.array([])
+                comp_result_name = np.array([])
+                gauss_result = np.array([])
+                gauss_result_type = np.array([])
+                gauss_result_name = np.array([])
+                fur_result = np.array([])
+                fur_result_type = np.array([])
+                fur_result_name = np.array([])
+            all_comp_range = np.concatenate(all_comp_range_parts) if all_comp_range_parts else np.array([])
             # line_result = np.concatenate([comp_result, gauss_result, fur_result])
             # line_result_type = np.concatenate([comp_result_type, gauss_result_type, fur_result_type])
             # line_result_name = np.concatenate([comp_result_name, gauss_result_name, fur_result_name])
@@ -680,78 +1079,108 @@ class QSOFitNew(QSOFit):
 
 
     # ---------MC error for emission line parameters-------------------
+    @timed_phase('new_line_mc')
     def new_line_mc(self, x, y, err, pp0, pp_limits, n_trails, compcenter, linecompname,
                     ind_line, nline_fit, linelist_fit, ngauss_fit):
         """calculate the Monte Carlo errror of line parameters"""
         linelist = self.linelist
         linenames = linelist[linelist['compname']==linecompname]['linename']
-        all_para_1comp = np.zeros(len(pp0)*n_trails).reshape(len(pp0), n_trails)
-        all_para_std = np.zeros(len(pp0))
-        all_fwhm = np.zeros(n_trails)
-        all_sigma = np.zeros(n_trails)
-        all_ew = np.zeros(n_trails)
-        all_peak = np.zeros(n_trails)
-        all_area = np.zeros(n_trails)
-        na_all_dict = {}
-        for line in linenames: 
-            if ('br' not in line and 'na' not in line) or ('Ha_na' in line) or ('Hb_na' in line):
-                emp_dict = {'fwhm': [],
-                            'sigma' : [],
-                            'ew' : [],
-                            'peak' : [],
-                            'area' : []}
-                na_all_dict.setdefault(line, emp_dict)
-
-        for tra in range(n_trails):
-            flux = y+np.random.randn(len(y))*err
-            line_fit = kmpfit.Fitter(residuals=self._residuals_line, data=(x, flux, err), maxiter=50)
-            line_fit.parinfo = pp_limits
-            line_fit.fit(params0=pp0)
-            line_fit.params = self.newpp
-            all_para_1comp[:, tra] = line_fit.params
-            
-            # further line properties
-            all_fwhm[tra], all_sigma[tra], all_ew[tra], all_peak[tra], all_area[tra] 
-            broad_all = self.line_prop(compcenter, line_fit.params, 'broad')
-            all_fwhm[tra] = broad_all[0]
-            all_sigma[tra] =  broad_all[1]
-            all_ew[tra] = broad_all[2]
-            all_peak[tra] = broad_all[3]
-            all_area[tra] = broad_all[4]     
-            all_line_name = []
-            for n in range(nline_fit):
-                for nn in range(int(ngauss_fit[n])):
-                    line_name = linelist['linename'][ind_line][n]
-                    all_line_name.append(line_name)
-            all_line_name = np.asarray(all_line_name)
-
-            for line in linenames: 
-                if ('br' not in line and 'na' not in line) or ('Ha_na' in line) or ('Hb_na' in line):
-                    try:
-                        par_ind = np.where(all_line_name==line)[0][0]*3
-                        linecenter = np.float(linelist[linelist['linename']==line]['lambda'][0])
-                        na_tmp = self.line_prop(linecenter, line_fit.params[par_ind:par_ind+3], 'narrow')
-                        na_all_dict[line]['fwhm'].append(na_tmp[0])
-                        na_all_dict[line]['sigma'].append(na_tmp[1])
-                        na_all_dict[line]['ew'].append(na_tmp[2])
-                        na_all_dict[line]['peak'].append(na_tmp[3])
-                        na_all_dict[line]['area'].append(na_tmp[4])
-                    except:
-                        print('Mismatch.')
-                        pass
-                    
-        for line in linenames: 
-            if ('br' not in line and 'na' not in line) or ('Ha_na' in line) or ('Hb_na' in line):
-                na_all_dict[line]['fwhm'] = getnonzeroarr(np.asarray(na_all_dict[line]['fwhm']))
-                na_all_dict[line]['sigma'] = getnonzeroarr(np.asarray(na_all_dict[line]['sigma']))
-                na_all_dict[line]['ew'] = getnonzeroarr(np.asarray(na_all_dict[line]['ew']))
-                na_all_dict[line]['peak'] = getnonzeroarr(np.asarray(na_all_dict[line]['peak']))
-                na_all_dict[line]['area'] = getnonzeroarr(np.asarray(na_all_dict[line]['area']))
-       
-        for st in range(len(pp0)):
-            all_para_std[st] = all_para_1comp[st, :].std()
-        
-        return all_para_std, all_fwhm.std(), all_sigma.std(), all_ew.std(), all_peak.std(), all_area.std(), na_all_dict
+        # the substring filter selecting the narrow lines is invariant
+        # across trials, so evaluate it once up front as one vectorized
+        # np.char mask over the component's line names
+        lname_arr = np.asarray(linenames)
+        namask = ((np.char.find(lname_arr, 'br') < 0)
+                  & (np.char.find(lname_arr, 'na') < 0)) \
+            | (np.char.find(lname_arr, 'Ha_na') >= 0) \
+            | (np.char.find(lname_arr, 'Hb_na') >= 0)
+        narrow_lines = lname_arr[namask].tolist()
+        line_idx = {line: k for k, line in enumerate(narrow_lines)}
+
+        # draw the Gaussian noise of all trials in one batched call of
+        # the PCG64 generator; each trial then works on its own row.
+        # The buffer is kept on the object and refilled in place, so
+        # complexes on the same wavelength window share one allocation
+        rng = np.random.default_rng()
+        buf = getattr(self, '_mc_noise_buf', None)
+        if buf is None or buf.shape != (n_trails, len(y)):
+            buf = np.empty((n_trails, len(y)))
+            self._mc_noise_buf = buf
+        rng.standard_normal(out=buf)
+        all_flux = y[None, :]+buf*err[None, :]
+
+        # the trials are independent, so they can be dispatched to a
+        # process pool when n_jobs > 1
+        n_jobs = getattr(self, 'n_jobs', 1)
+        trial = partial(_run_one_mc_trial, self, x=x, err=err, pp0=pp0,
+                        pp_limits=pp_limits)
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(trial, all_flux))
+        else:
+            results = [trial(flux) for flux in all_flux]
+
+        # one C-contiguous (n_trails, n_params) stack, shared by the
+        # property evaluation and the parameter-std reduction
+        all_para_1comp = np.stack(results)
+
+        # further line properties, evaluated over the whole parameter
+        # stack in one vectorized pass
+        all_fwhm, all_sigma, all_ew, all_peak, all_area = self._line_prop_mc(
+            compcenter, all_para_1comp, 'broad')
+
+        # the gaussian-to-line mapping and the line lookup tables do not
+        # change between trials, so build them once: name_to_idx maps a
+        # line name to the parameter index of its first gaussian and
+        # name_to_lambda to its laboratory wavelength
+        names = np.asarray(linelist['linename'])[ind_line]
+        counts = ngauss_fit[:len(names)]
+        all_line_name = np.repeat(names, counts)
+        name_to_idx = {}
+        for i, line_name in enumerate(all_line_name):
+            name_to_idx.setdefault(line_name, i*3)
+        # strip the Column/Quantity metadata once; the kernels only ever
+        # see bare float64 values
+        name_to_lambda = {str(n): float(l) for n, l in
+                          zip(linelist['linename'], linelist['lambda'])}
+
+        # evaluate the narrow-line properties of each line over the
+        # whole trial stack in one vectorized _line_prop_mc pass; the
+        # outputs live in one contiguous (n_lines, 5, n_trails) block
+        par_inds = np.full(len(narrow_lines), -1, dtype=np.int64)
+        linecenters = np.zeros(len(narrow_lines))
+        missing = []
+        for line, k in line_idx.items():
+            if line in name_to_idx:
+                par_inds[k] = name_to_idx[line]
+                linecenters[k] = name_to_lambda[line]
+            else:
+                missing.append(line)
+        if missing:
+            print('No fitted gaussian found for '+', '.join(missing)+'.')
+        # structure-of-arrays record per line: the trial axis of each
+        # quantity is one contiguous f8 field, so aggregations like
+        # na_stats['fwhm'].std(axis=1) stay vectorized
+        na_dtype = np.dtype([('line', 'U20')] +
+                            [(q, 'f8', (n_trails,)) for q in _NA_QUANTITIES])
+        na_stats = np.zeros(len(narrow_lines), dtype=na_dtype)
+        na_stats['line'] = narrow_lines
+        for k in range(len(narrow_lines)):
+            j = par_inds[k]
+            if j < 0:
+                continue
+            props = self._line_prop_mc(
+                linecenters[k], all_para_1comp[:, j:j+3], 'narrow')
+            for q, vals in zip(_NA_QUANTITIES, props):
+                na_stats[k][q] = vals
+        # compatibility shim for the dict-based result assembly
+        na_all_dict = _na_stats_to_dict(na_stats)
+
+        all_para_std = all_para_1comp.std(axis=0)
+        # one fused reduction over the five broad-line property arrays
+        std_vec = np.stack([all_fwhm, all_sigma, all_ew,
+                            all_peak, all_area]).std(axis=1)
+
+        return all_para_std, std_vec[0], std_vec[1], std_vec[2], std_vec[3], std_vec[4], na_all_dict
 
 
     def cal_na_line_res(self):
@@ -761,13 +1190,22 @@ class QSOFitNew(QSOFit):
                                 columns=self.gauss_result_name)
         #caution: dtypes are all object for df_gauss, conversion needed.
         if self.MC == True and self.na_all_dict:
+            logw = np.log(self.wave)
+            logw_conti = np.arange(logw.min(), logw.max(), 1.e-4*np.log(10))
+            conti_dense = self._conti_on_loggrid(logw_conti)
+            # inverse index: one O(1) lookup per line instead of a
+            # boolean scan over the whole linelist
+            lambda_col = np.asarray(linelist['lambda'])
+            linename_to_row = {str(n): i for i, n in
+                               enumerate(np.asarray(linelist['linename']))}
             for line in self.na_all_dict.keys():
-                linecenter = np.float(linelist[linelist['linename']==line]['lambda'][0])
-                line_scale = np.float(df_gauss[line+'_1_scale'])
-                line_centerwave = np.float(df_gauss[line+'_1_centerwave'])
-                line_sigma = np.float(df_gauss[line+'_1_sigma'])
+                linecenter = float(lambda_col[linename_to_row[line]])
+                line_scale = float(df_gauss[line+'_1_scale'])
+                line_centerwave = float(df_gauss[line+'_1_centerwave'])
+                line_sigma = float(df_gauss[line+'_1_sigma'])
                 line_param = np.array([line_scale,line_centerwave,line_sigma])
-                na_tmp = self.line_prop(linecenter, line_param, 'narrow')
+                na_tmp = self._narrow_line_prop(linecenter, line_param,
+                                                logw_conti, conti_dense)
                 par_list = list(self.na_all_dict[line].keys())
                 for i in range(len(par_list)):
                     par = par_list[i]